@@ -6,8 +6,10 @@ Polymarket 账户余额和持仓查询脚本
 import os
 from dotenv import load_dotenv
 from datetime import datetime
-from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import AssetType, BalanceAllowanceParams
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from py_clob_client.client import ClobClient  # web3 / eth-account: imported in create_client only
 
 # 加载环境变量
 load_dotenv()
@@ -20,11 +22,13 @@ SIGNATURE_TYPE = int(os.getenv("POLYMARKET_SIGNATURE_TYPE", "1"))
 FUNDER = os.getenv("POLYMARKET_FUNDER_E", "")
 
 
-def create_client() -> ClobClient:
+def create_client() -> "ClobClient":
     """创建并初始化 ClobClient"""
     if not PRIVATE_KEY:
         raise ValueError("POLYMARKET_PRIVATE_KEY 环境变量未设置，请检查 .env 文件")
     
+    from py_clob_client.client import ClobClient
+
     client = ClobClient(
         host=HOST,
         key=PRIVATE_KEY,
@@ -94,7 +98,7 @@ def timestamp_to_readable(timestamp) -> str:
         return f"无效时间 ({timestamp}, 错误: {str(e)})"
 
 
-def get_market_name(client: ClobClient, condition_id: str) -> str:
+def get_market_name(client: "ClobClient", condition_id: str) -> str:
     """
     获取市场名称（可读名称）
     
@@ -125,7 +129,7 @@ def get_market_name(client: ClobClient, condition_id: str) -> str:
     return condition_id
 
 
-def get_balance(client: ClobClient) -> dict:
+def get_balance(client: "ClobClient") -> dict:
     """
     获取账户余额 (USDC)
     
@@ -136,6 +140,8 @@ def get_balance(client: ClobClient) -> dict:
         包含余额信息的字典
     """
     try:
+        from py_clob_client.clob_types import AssetType, BalanceAllowanceParams
+
         params = BalanceAllowanceParams(
             asset_type=AssetType.COLLATERAL,
             signature_type=SIGNATURE_TYPE
@@ -222,7 +228,7 @@ def normalize_position_data(data: dict, data_type: str = "unknown") -> dict:
     return normalized
 
 
-def get_positions(client: ClobClient) -> list:
+def get_positions(client: "ClobClient") -> list:
     """
     获取当前持仓（统一格式）
     
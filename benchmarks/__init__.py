@@ -0,0 +1,7 @@
+"""
+Benchmarks over recorded captures (data/*listening*.csv, z.txt).
+
+    python -m benchmarks.run                 # run every suite, save and compare results
+    python -m benchmarks.run --suite decode  # one suite
+    python -m benchmarks.bench_decoder       # decoder backends only
+"""
@@ -0,0 +1,82 @@
+"""
+Per-message decode cost on recorded data: stdlib json + repeated float() (the
+old on_message path) against each decoder backend in scripts/trading/decoder.py.
+
+    python -m benchmarks.bench_decoder
+    python -m benchmarks.bench_decoder --raw z.txt --csv data/w_listening7.csv
+"""
+import argparse
+import json
+import time
+
+from benchmarks.replay import capture_frames, load_raw_frames
+from scripts.trading.decoder import BACKENDS, get_decoder
+
+
+def _baseline(frame):
+    # what on_message did before: json.loads, then float() on strings at every use
+    message = json.loads(frame)
+    if not isinstance(message, dict):
+        return
+    int(int(message["timestamp"]) / 1000)
+    for change in message.get("price_changes", ()):
+        if change["side"] != "BUY":
+            continue
+        best_ask = change["best_ask"]
+        0.98 > float(best_ask) and float(best_ask) > 0.5
+        1.1 / float(best_ask)
+
+
+def _decoded(decode):
+    def run(frame):
+        for msg in decode(frame):
+            msg.timestamp // 1000
+            for change in msg.price_changes:
+                if change.side != "BUY":
+                    continue
+                best_ask = change.best_ask
+                0.98 > best_ask and best_ask > 0.5
+                1.1 / best_ask
+    return run
+
+
+def time_per_message(fn, frames, repeat=5):
+    """Best-of-`repeat` mean cost per frame in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for frame in frames:
+            fn(frame)
+        best = min(best, time.perf_counter() - start)
+    return best / len(frames) * 1e6
+
+
+def run(frames, repeat=5):
+    results = {"baseline (json + float)": time_per_message(_baseline, frames, repeat)}
+    for backend in BACKENDS:
+        try:
+            decoder = get_decoder(backend)
+        except RuntimeError:
+            continue
+        results[backend] = time_per_message(_decoded(decoder.decode), frames, repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--raw", default="z.txt", help="Raw frame log, one message per line")
+    parser.add_argument("--csv", default="data/w_listening7.csv", help="Capture CSV to rebuild frames from")
+    parser.add_argument("--limit", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, frames in (("raw", load_raw_frames(args.raw)), ("csv", capture_frames(args.csv, args.limit))):
+        results = run(frames, args.repeat)
+        base = results["baseline (json + float)"]
+        print(f"{label}: {len(frames)} frames")
+        for name, us in results.items():
+            print(f"  {name:<24} {us:8.2f} us/msg  x{base / us:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Timing, memory and result storage for the benchmark suites.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# a suite is flagged when it gets this much slower than the previous run
+REGRESSION_TOLERANCE = 0.10
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def measure(name, fn, items, warmup=200):
+    """
+    Call fn(item) for every item and report throughput, per-item latency and peak memory.
+    Latency and memory come from separate passes so tracemalloc does not skew the timings.
+    """
+    for item in items[:warmup]:
+        fn(item)
+
+    clock = time.perf_counter_ns
+    latencies = []
+    append = latencies.append
+    start = clock()
+    for item in items:
+        t0 = clock()
+        fn(item)
+        append(clock() - t0)
+    elapsed = (clock() - start) / 1e9
+
+    tracemalloc.start()
+    for item in items:
+        fn(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "name": name,
+        "count": len(items),
+        "msgs_per_sec": len(items) / elapsed if elapsed else 0.0,
+        "p50_us": _percentile(latencies, 0.50) / 1e3,
+        "p99_us": _percentile(latencies, 0.99) / 1e3,
+        "peak_mem_kb": peak / 1024,
+    }
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(results, results_dir=RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    revision = git_revision()
+    payload = {
+        "revision": revision,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {r["name"]: r for r in results},
+    }
+    path = os.path.join(results_dir, f"{revision}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def load_previous(results_dir=RESULTS_DIR, exclude=None):
+    """Most recent stored run other than `exclude`."""
+    if not os.path.isdir(results_dir):
+        return None
+    paths = [os.path.join(results_dir, p) for p in os.listdir(results_dir) if p.endswith(".json")]
+    paths = [p for p in paths if not exclude or os.path.abspath(p) != os.path.abspath(exclude)]
+    if not paths:
+        return None
+    with open(max(paths, key=os.path.getmtime), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results, previous, tolerance=REGRESSION_TOLERANCE):
+    """Return (name, metric, old, new) for every metric that got worse by more than tolerance."""
+    regressions = []
+    old_results = previous.get("results", {}) if previous else {}
+    for r in results:
+        old = old_results.get(r["name"])
+        if not old:
+            continue
+        if r["msgs_per_sec"] < old["msgs_per_sec"] * (1 - tolerance):
+            regressions.append((r["name"], "msgs_per_sec", old["msgs_per_sec"], r["msgs_per_sec"]))
+        for metric in ("p50_us", "p99_us", "peak_mem_kb"):
+            if old[metric] and r[metric] > old[metric] * (1 + tolerance):
+                regressions.append((r["name"], metric, old[metric], r[metric]))
+    return regressions
+
+
+def format_table(results):
+    lines = [f"{'suite':<28} {'count':>8} {'msg/s':>12} {'p50 us':>9} {'p99 us':>9} {'peak KB':>9}"]
+    for r in results:
+        lines.append(
+            f"{r['name']:<28} {r['count']:>8} {r['msgs_per_sec']:>12.0f} "
+            f"{r['p50_us']:>9.2f} {r['p99_us']:>9.2f} {r['peak_mem_kb']:>9.1f}"
+        )
+    return "\n".join(lines)
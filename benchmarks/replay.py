@@ -0,0 +1,52 @@
+"""
+Turn recorded data back into websocket frames for replay.
+"""
+import csv
+import glob
+import json
+from datetime import datetime, timedelta, timezone
+
+UTC8 = timezone(timedelta(hours=8))
+
+# fixed fake token ids, the CSV captures only keep the UP/DOWN pick
+UP_ASSET = "1" * 77
+DOWN_ASSET = "2" * 77
+MARKET = "0x" + "0" * 64
+
+DEFAULT_CAPTURES = "data/w_listening*.csv"
+DEFAULT_RAW_LOG = "z.txt"
+
+
+def load_raw_frames(path=DEFAULT_RAW_LOG, keep_pong=False):
+    """One websocket frame per line, as dumped by the recorder."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and (keep_pong or "PONG" not in line)]
+
+
+def load_capture_rows(pattern=DEFAULT_CAPTURES, limit=None):
+    rows = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                rows.append(row)
+                if limit and len(rows) >= limit:
+                    return rows
+    return rows
+
+
+def row_to_frame(row):
+    """Rebuild a price_change frame (BUY leg plus the mirrored SELL leg) from a capture row."""
+    dt = datetime.strptime(row["timestamp"], "%Y-%m-%d %H:%M:%S").replace(tzinfo=UTC8)
+    asset = UP_ASSET if row["buy_pick"] == "UP" else DOWN_ASSET
+    leg = {"asset_id": asset, "price": row["buy_price"], "size": row["buy_size"], "side": "BUY",
+           "hash": "0" * 40, "best_bid": row["buy_best_bid"], "best_ask": row["buy_best_ask"]}
+    return json.dumps({
+        "market": MARKET,
+        "price_changes": [leg, dict(leg, side="SELL")],
+        "timestamp": str(int(dt.timestamp() * 1000)),
+        "event_type": "price_change",
+    }, separators=(",", ":"))
+
+
+def capture_frames(pattern=DEFAULT_CAPTURES, limit=None):
+    return [row_to_frame(row) for row in load_capture_rows(pattern, limit)]
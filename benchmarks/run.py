@@ -0,0 +1,215 @@
+"""
+Replay recorded captures through the recorder and trader hot paths.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --suite recorder --suite trader --limit 20000
+    python -m benchmarks.run --no-save          # print only
+"""
+import argparse
+import contextlib
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from benchmarks.harness import compare, format_table, load_previous, measure, save_results
+from benchmarks.replay import (DEFAULT_CAPTURES, DEFAULT_RAW_LOG, DOWN_ASSET, UP_ASSET,
+                               capture_frames, load_capture_rows, load_raw_frames)
+
+THRESHOLDS_CSV = "data/15min_thresholds.csv"
+RESULTS_CSV = "data/results_manual.csv"
+
+
+class _FakeWs:
+    def send(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+@contextlib.contextmanager
+def _quiet():
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def suite_decode(ctx):
+    from scripts.trading.decoder import BACKENDS, get_decoder
+
+    results = []
+    for backend in BACKENDS:
+        try:
+            decode = get_decoder(backend).decode
+        except RuntimeError:
+            continue
+        results.append(measure(f"decode[{backend}] raw", decode, ctx["raw_frames"]))
+        results.append(measure(f"decode[{backend}] capture", decode, ctx["frames"]))
+    return results
+
+
+def suite_recorder(ctx):
+    import web_socket
+
+    with tempfile.TemporaryDirectory() as tmp:
+        web_socket.csv_file = os.path.join(tmp, "listening.csv")
+        web_socket.create_csv(web_socket.csv_file)
+        book = web_socket.WebSocketOrderBook(
+            web_socket.MARKET_CHANNEL, "wss://localhost", [UP_ASSET, DOWN_ASSET], None, None, True, "bench"
+        )
+        ws = _FakeWs()
+
+        def on_message(frame):
+            book.event_ended = False
+            book.on_message(ws, frame)
+
+        with _quiet():
+            return [measure("recorder on_message", on_message, ctx["frames"])]
+
+
+def suite_trader(ctx):
+    from scripts.trading import market_feed, strategy
+    from scripts.trading.config import Settings
+    from scripts.trading.ledger import TradeLedger
+    from scripts.trading.strategies import ThresholdStrategy, load_thresholds
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.object(strategy, "place_orders_fast", lambda settings, orders: [{"success": True}] * len(orders)), \
+            mock.patch.object(strategy.time, "sleep", lambda s: None):
+        threshold = ThresholdStrategy(load_thresholds(THRESHOLDS_CSV), 0.99, wait_seconds=0)
+        book = market_feed.WebSocketOrderBook(
+            Settings(), market_feed.MARKET_CHANNEL, "wss://localhost", [UP_ASSET, DOWN_ASSET],
+            None, None, True, "bench", [threshold], TradeLedger(os.path.join(tmp, "ledger.sqlite")),
+        )
+        ws = _FakeWs()
+
+        def on_message(frame):
+            # re-arm so every eligible tick runs the full trigger check
+            book.event_ended = False
+            threshold.traded = False
+            book.on_message(ws, frame)
+
+        with _quiet():
+            return [measure("trader on_message", on_message, ctx["frames"])]
+
+
+def suite_csv_writer(ctx):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "listening.csv")
+
+        # the recorder opens the file in append mode for every row
+        def write_row(row):
+            with open(path, mode="a", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(row.values())
+
+        return [measure("csv writer (append per row)", write_row, ctx["rows"])]
+
+
+def suite_threshold(ctx):
+    with open(THRESHOLDS_CSV, newline="") as f:
+        thresholds = {int(r["second_idx"]): float(r["buy_price_threshold"]) for r in csv.DictReader(f)}
+    intervals = set(range(120, 781, 60))
+    sell_price = 0.99
+
+    ticks = []
+    for row in ctx["rows"]:
+        time_left = row.get("time_left") or row.get("left (real time)")
+        ticks.append((int(time_left), float(row["buy_best_ask"])))
+
+    def check(tick):
+        time_left, best_ask = tick
+        return (time_left in intervals and sell_price - 0.01 > best_ask
+                and best_ask > thresholds.get(time_left, 1.0))
+
+    return [measure("threshold check", check, ticks)]
+
+
+def suite_backtest(ctx):
+    import pandas as pd
+
+    from scripts.analysis.backtest import end_prob_rows
+
+    df = pd.DataFrame(ctx["rows"])
+    for col in ("buy_price", "buy_size", "buy_best_bid", "buy_best_ask"):
+        df[col] = df[col].astype(float)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df["suffix"] = df["suffix"].astype("int64")
+    results_df = pd.read_csv(RESULTS_CSV)
+    result_map = dict(zip(results_df["suffix"], results_df["outcome"]))
+    events = [event_df for _, event_df in df.groupby("suffix")]
+
+    return [measure("backtest end_prob (per event)", lambda e: end_prob_rows(e, result_map, key="suffix"), events, warmup=5)]
+
+
+def suite_startup(ctx):
+    from scripts.trading.strategies import compile_thresholds, load_thresholds
+
+    load_thresholds(THRESHOLDS_CSV)  # leaves a current .bin next to the CSV
+    results = [
+        measure("thresholds load (.bin)", lambda _: load_thresholds(THRESHOLDS_CSV), range(500), warmup=20),
+        measure("thresholds compile (csv)", lambda _: compile_thresholds(THRESHOLDS_CSV), range(500), warmup=20),
+    ]
+
+    # a fresh interpreter per run: what the entry point pays before its first line of main
+    for module in ("auto_trade", "auto_multiple_trade"):
+        command = [sys.executable, "-c", f"import {module}"]
+        probe = subprocess.run(command, capture_output=True, text=True)
+        if probe.returncode != 0:
+            raise ImportError(probe.stderr.strip().splitlines()[-1])
+        results.append(measure(f"import {module}", lambda _: subprocess.run(command, check=True), range(10), warmup=2))
+    return results
+
+
+SUITES = {
+    "decode": suite_decode,
+    "recorder": suite_recorder,
+    "trader": suite_trader,
+    "csv": suite_csv_writer,
+    "threshold": suite_threshold,
+    "backtest": suite_backtest,
+    "startup": suite_startup,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="Suites to run (default: all)")
+    parser.add_argument("--captures", default=DEFAULT_CAPTURES, help="Glob of capture CSVs to replay")
+    parser.add_argument("--raw", default=DEFAULT_RAW_LOG, help="Raw frame log, one message per line")
+    parser.add_argument("--limit", type=int, default=50000, help="Max capture rows to replay")
+    parser.add_argument("--no-save", action="store_true", help="Do not store results under benchmarks/results")
+    args = parser.parse_args()
+
+    rows = load_capture_rows(args.captures, args.limit)
+    ctx = {
+        "rows": rows,
+        "frames": capture_frames(args.captures, args.limit),
+        "raw_frames": load_raw_frames(args.raw),
+    }
+
+    results = []
+    for name in args.suite or list(SUITES):
+        try:
+            results.extend(SUITES[name](ctx))
+        except ImportError as e:
+            print(f"skip {name}: {e}", file=sys.stderr)
+
+    print(format_table(results))
+
+    if args.no_save:
+        return
+    path = save_results(results)
+    previous = load_previous(exclude=path)
+    print(f"\nSaved to {path}")
+    if previous:
+        regressions = compare(results, previous)
+        print(f"Compared with {previous['revision']}: {len(regressions)} regression(s)")
+        for name, metric, old, new in regressions:
+            print(f"  {name}: {metric} {old:.2f} -> {new:.2f}")
+
+
+if __name__ == "__main__":
+    main()